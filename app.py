@@ -1,12 +1,34 @@
 import streamlit as st
 import os
-import io
-from contextlib import redirect_stdout
-from source import *
+import threading
+from types import SimpleNamespace
 
+_LOGO_URL = "https://www.quantuniversity.com/assets/img/logo5.jpg"
+
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _logo_bytes():
+    # Fetched once per day per process; Streamlit then serves it from its media cache
+    import requests
+    resp = requests.get(_LOGO_URL, timeout=5)
+    resp.raise_for_status()
+    return resp.content
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _logo():
+    # Exceptions aren't cached, so cache the URL fallback briefly; an offline host
+    # then waits on the fetch timeout once per ttl instead of on every rerun
+    try:
+        return _logo_bytes()
+    except Exception:
+        return _LOGO_URL
+
+
+# set_page_config is per-session page state and must stay on every run
 st.set_page_config(
     page_title="QuLab: Foundation and Platform Setup", layout="wide")
-st.sidebar.image("https://www.quantuniversity.com/assets/img/logo5.jpg")
+st.sidebar.image(_logo())
 st.sidebar.divider()
 st.title("QuLab: Foundation and Platform Setup")
 st.divider()
@@ -32,14 +54,6 @@ if 'prod_validation_error' not in st.session_state:
     st.session_state.prod_validation_error = None
 if 'sim_scenario_results' not in st.session_state:
     st.session_state.sim_scenario_results = []
-if 'show_fix_1' not in st.session_state:
-    st.session_state.show_fix_1 = False
-if 'show_fix_2' not in st.session_state:
-    st.session_state.show_fix_2 = False
-if 'show_fix_3' not in st.session_state:
-    st.session_state.show_fix_3 = False
-if 'show_fix_4' not in st.session_state:
-    st.session_state.show_fix_4 = False
 
 # Global environment variables required by source.py's Settings class
 GLOBAL_REQUIRED_ENV_VARS = {
@@ -53,31 +67,383 @@ GLOBAL_REQUIRED_ENV_VARS = {
     "S3_BUCKET": "test_s3_bucket"
 }
 
+@st.cache_resource
+def _ensure_global_env(prefixes):
+    # One-shot per process: the required vars never change between clicks.
+    # Inherited settings-like vars are scrubbed here once so they cannot leak
+    # into validation; later clears only touch the keys we set ourselves.
+    for key in list(os.environ):
+        if key.startswith(prefixes):
+            try:
+                del os.environ[key]
+            except KeyError:
+                pass
+    missing = GLOBAL_REQUIRED_ENV_VARS.keys() - os.environ.keys()
+    os.environ.update({k: GLOBAL_REQUIRED_ENV_VARS[k] for k in missing})
+    return True
+
+
+@st.cache_resource
+def _load_source():
+    # Deferred until a handler needs it: importing source replays the notebook
+    # cells. They patch the env only temporarily, but seed it once here anyway.
+    import source
+    _ensure_global_env(source.SETTINGS_ENV_PREFIXES)
+    return source
 
-def _set_env_vars(env_dict):
-    for key, value in env_dict.items():
-        if value is not None:
-            os.environ[key] = str(value)
-        elif key in os.environ:
-            del os.environ[key]
 
-    # Ensure global required vars are always present if not overridden
-    for key, value in GLOBAL_REQUIRED_ENV_VARS.items():
-        if key not in os.environ:
-            os.environ[key] = value
+@st.cache_resource
+def _tracked_env_keys():
+    # Process-wide like os.environ itself, so keys survive an aborted rerun; sessions
+    # run on separate threads, so every access goes through the lock
+    return set(), threading.Lock()
+
+
+_TRACKED_KEYS, _TRACKED_LOCK = _tracked_env_keys()
+
+
+_BOOL_STR = {True: "true", False: "false"}
+
+
+def _env_str(v):
+    # Identity check so 1/0/1.0 are not mistaken for booleans by the dict lookup
+    if v is True or v is False:
+        return _BOOL_STR[v]
+    return str(v)
+
+
+def _set_env_vars(env_dict):
+    with _TRACKED_LOCK:
+        _TRACKED_KEYS.update(env_dict)
+    # Diff against the live environment so unchanged keys skip putenv/unsetenv
+    env = os.environ
+    to_set = {}
+    for k, v in env_dict.items():
+        if v is not None:
+            sv = _env_str(v)
+            if env.get(k) != sv:
+                to_set[k] = sv
+    to_del = [k for k, v in env_dict.items() if v is None and k in env]
+    env.update(to_set)
+    for k in to_del:
+        env.pop(k, None)
 
 
 def _clear_env_vars():
-    # Only clear variables starting with a prefix to avoid clearing system vars
-    prefixes_to_clear = ("APP_", "SECRET_", "RATE_", "DAILY_", "COST_", "W_", "OPENAI_", "ANTHROPIC_",
-                         "HITL_", "SNOWFLAKE_", "AWS_", "S3_", "REDIS_", "CACHE_", "CELERY_", "OTEL_",
-                         "ALPHA_", "BETA_", "LAMBDA_", "DELTA_", "API_", "PARAM_", "DEFAULT_",
-                         "FALLBACK_", "LOG_", "DEBUG", "S3_")
-    for key in list(os.environ.keys()):
-        if key.startswith(prefixes_to_clear):
-            del os.environ[key]
+    env = os.environ
+    with _TRACKED_LOCK:
+        keys = list(_TRACKED_KEYS)
+        _TRACKED_KEYS.clear()
+    for key in keys:
+        # Global required vars are seeded only once, so restore rather than drop them
+        if key in GLOBAL_REQUIRED_ENV_VARS:
+            if env.get(key) != GLOBAL_REQUIRED_ENV_VARS[key]:
+                env[key] = GLOBAL_REQUIRED_ENV_VARS[key]
+        else:
+            env.pop(key, None)
 
 
+@st.cache_resource
+def _default_settings():
+    # Inputs are the fixed GLOBAL_REQUIRED_ENV_VARS, so validate once per process
+    src = _load_source()
+    _set_env_vars(GLOBAL_REQUIRED_ENV_VARS)
+    try:
+        return src.Settings()
+    finally:
+        _clear_env_vars()
+
+
+def _fast_weight_settings(weights):
+    # The caller has checked each weight is within [0, 1] and the sum, so skip
+    # per-field validation and only re-run the after-validator (weights, plus the
+    # production rules, which are a no-op for the development defaults)
+    inst = _default_settings().model_copy(update=weights)
+    try:
+        inst.validate_cross_field_rules()
+    except ValueError:
+        return None
+    return inst
+
+
+@st.cache_data(show_spinner=False)
+def _validate_weights(weight_items):
+    # Keyed on the submitted (name, weight) pairs; returns (settings, error_text)
+    src = _load_source()
+    weights = dict(weight_items)
+    settings = None
+    # Out-of-range weights can still sum to 1.0; let the field bounds report them
+    if all(0.0 <= w <= 1.0 for w in weights.values()) and src.dimension_weights_ok(weights.values()):
+        settings = _fast_weight_settings(weights)
+    if settings is None:
+        # Full validation from a plain dict, e.g. for the intentionally invalid demo
+        try:
+            settings = src.SETTINGS_ADAPTER.validate_python(weights)
+        except src.ValidationError as e:
+            return None, str(e)
+    return settings, None
+
+
+@st.cache_data(show_spinner=False)
+def _validate_prod(app_env, debug, secret_key, openai_key, anthropic_key):
+    # Keyed on the form inputs, so resubmitting identical values skips validation
+    src = _load_source()
+    env_vars = {
+        "APP_ENV": app_env,
+        "DEBUG": debug,
+        "SECRET_KEY": secret_key,
+    }
+    # Only set API keys if they're non-empty
+    if openai_key and openai_key.strip():
+        env_vars["OPENAI_API_KEY"] = openai_key
+    if anthropic_key and anthropic_key.strip():
+        env_vars["ANTHROPIC_API_KEY"] = anthropic_key
+
+    _clear_env_vars()
+    _set_env_vars(env_vars)
+    try:
+        return src.Settings(), None
+    except src.ValidationError as e:
+        return None, str(e)
+    finally:
+        _clear_env_vars()
+
+
+def _bulk_prefix_ok(keys, prefix):
+    # One vectorized prefix test over the whole batch; single inputs use str.startswith
+    import numpy as np
+    return np.char.startswith(np.asarray(keys, dtype=str), prefix)
+
+
+def _display_validation_result(ok_key, err_key):
+    # Errors are stored pre-formatted (str(e)) so reruns don't re-walk the ValidationError
+    err = st.session_state.get(err_key)
+    if not err:
+        return
+    st.markdown("**Last Validation Result:**")
+    if st.session_state.get(ok_key):
+        st.success("✅ Valid settings were loaded last.")
+    else:
+        st.error(f"❌ Last attempt resulted in an error:\n```\n{err}\n```")
+
+
+# Static sidebar sections, each emitted as a single markdown element
+_SIDEBAR_OBJECTIVES_MD = """---
+### 🎯 Key Objectives
+- **Remember:** List the components of a FastAPI application and Pydantic validation
+- **Understand:** Explain why configuration validation prevents runtime errors
+- **Apply:** Implement a validated configuration system with weight constraints
+- **Create:** Design a project structure for production PE intelligence platforms
+"""
+
+_SIDEBAR_TOOLS_MD = """---
+### 🛠️ Tools Introduced
+- **Pydantic v2** - Data validation and settings management
+- **FastAPI** - Modern Python web framework
+- **Poetry** - Python dependency management
+- **Structlog** - Structured logging
+- **Redis** - Caching and task queues
+- **OpenTelemetry** - Distributed tracing
+"""
+
+# Static bullet lists rendered on the tutorial pages
+_CONFIG_FEATURES_MD = "\n".join([
+    "- **Type Safety**: All settings are strongly typed with proper validation",
+    "- **Security**: Sensitive data uses `SecretStr` to prevent accidental exposure",
+    "- **Field Validation**: Range constraints (e.g., `ge=1, le=1000`) ensure values are within bounds",
+    "- **Cross-Field Validation**: `@model_validator` ensures dimension weights sum to 1.0",
+    "- **Environment-Specific Rules**: Production environment has stricter requirements",
+])
+
+_FASTAPI_FEATURES_MD = "\n".join([
+    "- **Lifespan Management**: Proper startup/shutdown handling for resources",
+    "- **Request Correlation**: Each request gets a unique ID for distributed tracing",
+    "- **Performance Tracking**: Request duration automatically logged",
+    "- **Error Handling**: Global exception handler with environment-aware error details",
+    "- **Security**: CORS properly configured based on environment",
+])
+
+_PROD_RULES_MD = "\n".join([
+    "1.  `DEBUG` mode must be `False`.",
+    "2.  `SECRET_KEY` length must be at least 32 characters.",
+    "3.  At least one of `OPENAI_API_KEY` or `ANTHROPIC_API_KEY` must be provided.",
+])
+
+_DEFAULT_WEIGHTS = {
+    "W_DATA_INFRA": 0.18,
+    "W_AI_GOVERNANCE": 0.15,
+    "W_TECH_STACK": 0.15,
+    "W_TALENT": 0.17,
+    "W_LEADERSHIP": 0.13,
+    "W_USE_CASES": 0.12,
+    "W_CULTURE": 0.10,
+}
+
+# Display label -> Settings attribute for the loaded-weights table
+_WEIGHT_ROWS = (
+    ("Data Infra", "W_DATA_INFRA"),
+    ("AI Governance", "W_AI_GOVERNANCE"),
+    ("Tech Stack", "W_TECH_STACK"),
+    ("Talent", "W_TALENT"),
+    ("Leadership", "W_LEADERSHIP"),
+    ("Use Cases", "W_USE_CASES"),
+    ("Culture", "W_CULTURE"),
+)
+
+# Client-side hints for the production form: (predicate, st method, message)
+_PROD_CHECKS = (
+    (lambda c: c.prod and not c.openai and not c.anthropic,
+     "warning", "⚠️ At least one LLM API key is required in production"),
+    (lambda c: c.openai and c.openai[:3] != "sk-",
+     "warning", "⚠️ OpenAI API key should start with 'sk-'"),
+    (lambda c: c.anthropic and not c.anthropic.startswith("sk-ant-"),
+     "info", "💡 Anthropic API keys typically start with 'sk-ant-'"),
+    (lambda c: c.prod and c.secret_len < 32,
+     "warning", "⚠️ SECRET_KEY is only {secret_len} characters. Production requires ≥32 characters."),
+    (lambda c: c.prod and c.debug,
+     "warning", "⚠️ DEBUG mode should be disabled in production"),
+)
+
+# Troubleshooting entries: (title, wrong snippet, fixed snippet, explanation)
+_MISTAKES = (
+    (
+        "Dimension weights don't sum to 1.0",
+        '''# WRONG
+W_DATA_INFRA = 0.20
+W_AI_GOVERNANCE = 0.15
+W_TECH_STACK = 0.15
+W_TALENT = 0.20
+W_LEADERSHIP = 0.15
+W_USE_CASES = 0.10
+W_CULTURE = 0.10
+# Sum = 1.05!''',
+        '''# CORRECT
+W_DATA_INFRA = 0.18
+W_AI_GOVERNANCE = 0.15
+W_TECH_STACK = 0.15
+W_TALENT = 0.17
+W_LEADERSHIP = 0.13
+W_USE_CASES = 0.12
+W_CULTURE = 0.10
+# Sum = 1.00 ✓
+
+@model_validator(mode="after")
+def validate_dimension_weights(self):
+    """Validate dimension weights sum to 1.0."""
+    weights = [
+        self.W_DATA_INFRA, self.W_AI_GOVERNANCE, self.W_TECH_STACK,
+        self.W_TALENT, self.W_LEADERSHIP, self.W_USE_CASES, self.W_CULTURE
+    ]
+    total = sum(weights)
+    if abs(total - 1.0) > 0.001:
+        raise ValueError(f"Dimension weights must sum to 1.0, got {total}")
+    return self''',
+        "The `@model_validator` automatically catches invalid weight sums at startup, preventing configuration errors from reaching production.",
+    ),
+    (
+        "Exposing secrets in logs",
+        '''# WRONG
+logger.info("connecting", password=settings.SNOWFLAKE_PASSWORD)''',
+        '''# CORRECT - SecretStr masks the value automatically
+from pydantic import SecretStr
+
+class Settings(BaseSettings):
+    SNOWFLAKE_PASSWORD: SecretStr  # Will be masked in logs
+    
+# Safe logging - password is masked
+logger.info("connecting", password=settings.SNOWFLAKE_PASSWORD)
+# Output: password=SecretStr('**********')
+
+# Only access the secret when actually needed
+actual_password = settings.SNOWFLAKE_PASSWORD.get_secret_value()''',
+        "`SecretStr` automatically masks sensitive values in logs and string representations, preventing accidental exposure.",
+    ),
+    (
+        "Missing lifespan context manager",
+        '''# WRONG - No cleanup on shutdown
+app = FastAPI()
+redis_client = Redis()  # Leaks on shutdown!''',
+        '''# CORRECT - Proper resource management
+from contextlib import asynccontextmanager
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    redis_client = Redis()
+    logger.info("redis_connected")
+    
+    yield  # Application runs here
+    
+    # Shutdown - guaranteed cleanup
+    await redis_client.close()
+    logger.info("redis_disconnected")
+
+app = FastAPI(lifespan=lifespan)''',
+        "The lifespan context manager ensures proper cleanup of connections and resources when the application shuts down, preventing resource leaks.",
+    ),
+    (
+        "Not validating at startup",
+        '''# WRONG - Fails at runtime when first used
+def get_sector_baseline(sector_id):
+    return db.query(...)  # Database not connected!''',
+        '''# CORRECT - Validate at startup
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup validation
+    settings = get_settings()  # Pydantic validates here
+    
+    # Test database connection
+    try:
+        await db.execute("SELECT 1")
+        logger.info("database_validated")
+    except Exception as e:
+        logger.error("database_validation_failed", error=str(e))
+        raise  # Fail fast - don't start if DB is unreachable
+    
+    yield
+    
+    # Shutdown
+    await db.close()
+
+app = FastAPI(lifespan=lifespan)
+
+# Now this is safe - we know DB is connected
+def get_sector_baseline(sector_id):
+    return db.query(...)''',
+        "Validate all external dependencies during startup using the lifespan context manager. This ensures the application fails fast with clear errors rather than failing mysteriously at runtime.",
+    ),
+)
+
+# Static page prose, one markdown element per block between widgets
+_WEIGHTS_INTRO_MD = "\n\n".join([
+    "### 4. Implementing Business Logic: Cross-Field Validation for Scoring Weights",
+    "A core component of the PE intelligence platform is its investment scoring model, which relies on various dimensions (e.g., data infrastructure, AI governance, talent). The relative importance of these dimensions is defined by a set of weights. A critical business rule mandates that these **dimension weights must sum up to exactly 1.0** to ensure a coherent and balanced scoring mechanism. Deviations from this sum would lead to skewed, unreliable scores and potentially poor investment recommendations.",
+    "As a Data Engineer, I need to implement a robust check to enforce this rule. Pydantic's `@model_validator(mode=\"after\")` is perfect for this, as it allows us to perform validation logic that involves multiple fields *after* individual field validations have passed.",
+    "#### Cross-Field Validation Code",
+    "Here's how we implement cross-field validation to ensure dimension weights sum to 1.0:",
+])
+
+_WEIGHTS_TASK_MD = "\n\n".join([
+    "#### Workflow Task: Validate Dimension Weights Sum to 1.0",
+    r"We will define new fields for dimension weights and then add a `@model_validator` to ensure their sum is $1.0$. A small tolerance $\epsilon$ is used to account for floating-point inaccuracies. The validation check will be:",
+    r"$$\left| \sum_{{i=1}}^{{n}} w_i - 1.0 \right| > \epsilon$$",
+    r"where $w_i$ are the dimension weights and $\epsilon = 0.001$.",
+    "Adjust the dimension weights below. Ensure their sum is approximately 1.0 (within 0.001 tolerance) to pass validation. The default values sum to 1.0.",
+])
+
+_WEIGHTS_OUTRO_MD = "\n\n".join([
+    "The first scenario successfully loads settings where the default dimension weights (or explicitly set ones that sum to 1.0) pass the `@model_validator`. This demonstrates a correct configuration. The second scenario, however, intentionally provides weights that do not sum to $1.0$. As expected, Pydantic's `@model_validator` catches this discrepancy and raises a `ValueError` wrapped within a `ValidationError`.",
+    "This validation is critical for the PE intelligence platform. It ensures that the investment scoring model is always configured with logically consistent weights, preventing calculation errors that could lead to flawed analytical outputs and incorrect investment decisions. It’s a direct safeguard against subtle yet significant business logic flaws that might otherwise only be detected much later in the analysis pipeline, if at all.",
+    "---",
+])
+
+_MISTAKES_INTRO_MD = "\n\n".join([
+    "### 6. Catching Errors Early: Configuration Simulation and Reporting",
+    "The ultimate value of a robust configuration validation system is its ability to prevent failures before they impact users. As a Data Engineer preparing a deployment, I need a way to confidently verify that a given set of environment variables or configuration files will result in a valid application state. This \"Validated Configuration Report\" ensures that any potential issues are identified and resolved during development or staging, rather than during a critical production rollout.",
+    "We can simulate different configuration scenarios and observe Pydantic's error reporting. This acts as our \"report,\" detailing what works and what breaks, and why.",
+    "### Common Mistakes & Troubleshooting",
+])
+
 st.sidebar.title("Navigation")
 page_options = [
     "Introduction",
@@ -89,69 +455,63 @@ page_options = [
     "6. Environment-Specific Validation (Production)",
     "Configuration Simulation & Troubleshooting"
 ]
+_PAGE_INDEX = {name: i for i, name in enumerate(page_options)}
+_DEFAULT_PAGE = page_options[0]
 
 # Use index to set default selection based on state
-if st.session_state.current_page not in page_options:
-    st.session_state.current_page = page_options[0]
+current = st.session_state.current_page
+idx = _PAGE_INDEX.get(current, 0)
+if current not in _PAGE_INDEX:
+    st.session_state.current_page = _DEFAULT_PAGE
 
 selection = st.sidebar.selectbox(
     "Go to section:",
     page_options,
-    index=page_options.index(st.session_state.current_page)
+    index=idx
 )
-st.session_state.current_page = selection
-
-st.sidebar.divider()
-st.sidebar.markdown("### 🎯 Key Objectives")
-st.sidebar.markdown("""
-- **Remember:** List the components of a FastAPI application and Pydantic validation
-- **Understand:** Explain why configuration validation prevents runtime errors
-- **Apply:** Implement a validated configuration system with weight constraints
-- **Create:** Design a project structure for production PE intelligence platforms
-""")
+# Fingerprint of the last rendered page; only write state when it changes
+_page_changed = st.session_state.get('_last_rendered_page') != selection
+if _page_changed:
+    st.session_state['_last_rendered_page'] = selection
+    st.session_state.current_page = selection
 
-st.sidebar.divider()
-st.sidebar.markdown("### 🛠️ Tools Introduced")
-st.sidebar.markdown("""
-- **Pydantic v2** - Data validation and settings management
-- **FastAPI** - Modern Python web framework
-- **Poetry** - Python dependency management
-- **Structlog** - Structured logging
-- **Redis** - Caching and task queues
-- **OpenTelemetry** - Distributed tracing
-""")
+st.sidebar.markdown(_SIDEBAR_OBJECTIVES_MD)
+st.sidebar.markdown(_SIDEBAR_TOOLS_MD)
 
 
 if st.session_state.current_page == "Introduction":
-    st.markdown(f"## Introduction: Safeguarding the PE Intelligence Platform")
-    st.markdown(f"")
-    st.markdown(f"As a **Software Developer** building the Organizational AIR Scoring platform, ensuring the robustness and security of our application configurations is paramount. Every new feature or data processing service we deploy relies on correct, consistent, and validated settings across different environments – development, staging, and crucially, production. A single misconfigured parameter, such as an incorrect API key, an out-of-bounds budget, or an improperly weighted scoring dimension, can lead to critical application crashes, compromised data integrity, or skewed analytical outcomes that directly impact investment decisions.")
-    st.markdown(f"")
-    st.markdown(f"This notebook outlines a real-world workflow to implement a highly reliable configuration system using Pydantic v2. Our goal is to prevent these costly configuration-related bugs by enforcing strict validation rules at application startup, significantly reducing operational overhead and building trust in our platform's outputs. We will walk through defining settings, applying various validation types, and simulating different environmental scenarios to demonstrate how invalid configurations are caught *before* they can cause harm.")
-    st.markdown(f"---")
+    st.markdown("\n\n".join([
+        "## Introduction: Safeguarding the PE Intelligence Platform",
+        "As a **Software Developer** building the Organizational AIR Scoring platform, ensuring the robustness and security of our application configurations is paramount. Every new feature or data processing service we deploy relies on correct, consistent, and validated settings across different environments – development, staging, and crucially, production. A single misconfigured parameter, such as an incorrect API key, an out-of-bounds budget, or an improperly weighted scoring dimension, can lead to critical application crashes, compromised data integrity, or skewed analytical outcomes that directly impact investment decisions.",
+        "This notebook outlines a real-world workflow to implement a highly reliable configuration system using Pydantic v2. Our goal is to prevent these costly configuration-related bugs by enforcing strict validation rules at application startup, significantly reducing operational overhead and building trust in our platform's outputs. We will walk through defining settings, applying various validation types, and simulating different environmental scenarios to demonstrate how invalid configurations are caught *before* they can cause harm.",
+        "---",
+    ]))
 
 elif st.session_state.current_page == "1. Project Initialization":
-    st.markdown(f"### Task 1.1: Project Initialization")
-    st.markdown(f"Before we dive into configuration validation, let's set up the proper project structure. This foundational step ensures we have a well-organized codebase that follows Python best practices.")
-
-    st.markdown(f"#### Step 1: Create Project Structure")
-    st.markdown(f"Run the following commands to initialize your project:")
+    st.markdown("\n\n".join([
+        "### Task 1.1: Project Initialization",
+        "Before we dive into configuration validation, let's set up the proper project structure. This foundational step ensures we have a well-organized codebase that follows Python best practices.",
+        "#### Step 1: Create Project Structure",
+        "Run the following commands to initialize your project:",
+    ]))
     st.code('''# Create project structure
 mkdir pe-orgair-platform && cd pe-orgair-platform
 poetry init --name="pe-orgair-platform" --python="^3.12"''', language='bash')
 
-    st.markdown(f"#### Step 2: Install Dependencies")
-    st.markdown(f"Install the core dependencies for Week 1:")
+    st.markdown("\n\n".join([
+        "#### Step 2: Install Dependencies",
+        "Install the core dependencies for Week 1:",
+    ]))
     st.code('''# Install Week 1 dependencies
 poetry add fastapi "uvicorn[standard]" pydantic pydantic-settings httpx
 poetry add snowflake-connector-python sqlalchemy alembic boto3 redis
 poetry add structlog sse-starlette websockets''', language='bash')
 
-    st.markdown(f"#### Step 3: Install Development Dependencies")
+    st.markdown("#### Step 3: Install Development Dependencies")
     st.code('''# Development dependencies
 poetry add --group dev pytest pytest-asyncio pytest-cov black ruff mypy hypothesis''', language='bash')
 
-    st.markdown(f"#### Step 4: Create Source Structure")
+    st.markdown("#### Step 4: Create Source Structure")
     st.code('''# Create source structure
 mkdir -p src/pe_orgair/api/routes/v1
 mkdir -p src/pe_orgair/api/routes/v2
@@ -170,15 +530,15 @@ mkdir -p scripts
 mkdir -p migrations''', language='bash')
 
     st.info("💡 **Note:** This structure provides a clean separation of concerns with dedicated folders for API routes, configuration, models, services, and testing.")
-    st.markdown(f"---")
+    st.markdown("---")
 
 elif st.session_state.current_page == "2. Configuration with Validation":
-    st.markdown(f"### Task 1.2: Configuration with Validation")
-    st.markdown(f"Now let's implement the core configuration system using Pydantic v2. This will be the foundation of our application's settings management.")
-
-    st.markdown(f"#### File: `src/pe_orgair/config/settings.py`")
-    st.markdown(
-        f"This module defines our application settings with comprehensive validation:")
+    st.markdown("\n\n".join([
+        "### Task 1.2: Configuration with Validation",
+        "Now let's implement the core configuration system using Pydantic v2. This will be the foundation of our application's settings management.",
+        "#### File: `src/pe_orgair/config/settings.py`",
+        "This module defines our application settings with comprehensive validation:",
+    ]))
 
     st.code('''"""Application configuration with comprehensive validation."""
 from typing import Optional, Literal, List
@@ -315,58 +675,44 @@ def get_settings() -> Settings:
 
 settings = get_settings()''', language='python')
 
-    st.markdown(f"#### Key Features:")
-    st.markdown(
-        f"- **Type Safety**: All settings are strongly typed with proper validation")
-    st.markdown(
-        f"- **Security**: Sensitive data uses `SecretStr` to prevent accidental exposure")
-    st.markdown(
-        f"- **Field Validation**: Range constraints (e.g., `ge=1, le=1000`) ensure values are within bounds")
-    st.markdown(
-        f"- **Cross-Field Validation**: `@model_validator` ensures dimension weights sum to 1.0")
-    st.markdown(
-        f"- **Environment-Specific Rules**: Production environment has stricter requirements")
+    st.markdown("#### Key Features:")
+    st.markdown(_CONFIG_FEATURES_MD)
 
     if st.button("Load Default Configuration Settings"):
-        _set_env_vars(GLOBAL_REQUIRED_ENV_VARS)
-        get_settings.cache_clear()
+        src = _load_source()
         try:
-            st.session_state.current_settings = get_settings()
+            st.session_state.current_settings = _default_settings()
             st.session_state.settings_initialized = True
             st.success("✅ Default settings loaded successfully!")
-        except ValidationError as e:
+        except src.ValidationError as e:
             st.error(f"❌ Error loading default settings: {e}")
             st.session_state.settings_initialized = False
             st.session_state.current_settings = None
-        finally:
-            _clear_env_vars()
 
     if st.session_state.settings_initialized and st.session_state.current_settings:
         settings = st.session_state.current_settings
-        st.markdown(f"**Loaded Configuration:**")
+        st.markdown("**Loaded Configuration:**")
         col1, col2 = st.columns(2)
         with col1:
-            st.markdown(f"- App Name: `{settings.APP_NAME}`")
-            st.markdown(f"- Environment: `{settings.APP_ENV}`")
-            st.markdown(f"- Debug Mode: `{settings.DEBUG}`")
             st.markdown(
+                f"- App Name: `{settings.APP_NAME}`\n"
+                f"- Environment: `{settings.APP_ENV}`\n"
+                f"- Debug Mode: `{settings.DEBUG}`\n"
                 f"- API Rate Limit: `{settings.RATE_LIMIT_PER_MINUTE}` req/min")
         with col2:
             st.markdown(
-                f"- Daily Cost Budget: `${settings.DAILY_COST_BUDGET_USD}`")
-            st.markdown(
-                f"- Cost Alert Threshold: `{settings.COST_ALERT_THRESHOLD_PCT*100}%`")
-            st.markdown(
-                f"- HITL Score Threshold: `{settings.HITL_SCORE_CHANGE_THRESHOLD}`")
-            st.markdown(
+                f"- Daily Cost Budget: `${settings.DAILY_COST_BUDGET_USD}`\n"
+                f"- Cost Alert Threshold: `{settings.COST_ALERT_THRESHOLD_PCT*100}%`\n"
+                f"- HITL Score Threshold: `{settings.HITL_SCORE_CHANGE_THRESHOLD}`\n"
                 f"- Secret Key Set: `{'Yes' if settings.SECRET_KEY else 'No'}` (masked)")
-    st.markdown(f"---")
+    st.markdown("---")
 
 elif st.session_state.current_page == "3. FastAPI Application Setup":
-    st.markdown(f"### Task 1.3: FastAPI Application with Middleware")
-    st.markdown(f"With our configuration system in place, let's build the FastAPI application with comprehensive middleware for logging, tracing, and error handling.")
-
-    st.markdown(f"#### File: `src/pe_orgair/api/main.py`")
+    st.markdown("\n\n".join([
+        "### Task 1.3: FastAPI Application with Middleware",
+        "With our configuration system in place, let's build the FastAPI application with comprehensive middleware for logging, tracing, and error handling.",
+        "#### File: `src/pe_orgair/api/main.py`",
+    ]))
     st.code('''"""FastAPI application with comprehensive middleware stack."""
 from contextlib import asynccontextmanager
 from typing import Callable
@@ -473,32 +819,25 @@ def create_app() -> FastAPI:
 
 app = create_app()''', language='python')
 
-    st.markdown(f"#### Key Features:")
-    st.markdown(
-        f"- **Lifespan Management**: Proper startup/shutdown handling for resources")
-    st.markdown(
-        f"- **Request Correlation**: Each request gets a unique ID for distributed tracing")
-    st.markdown(
-        f"- **Performance Tracking**: Request duration automatically logged")
-    st.markdown(
-        f"- **Error Handling**: Global exception handler with environment-aware error details")
-    st.markdown(f"- **Security**: CORS properly configured based on environment")
+    st.markdown("#### Key Features:")
+    st.markdown(_FASTAPI_FEATURES_MD)
 
     st.info("💡 **Best Practice:** The lifespan context manager ensures proper cleanup of database connections, cache clients, and other resources when the application shuts down.")
-    st.markdown(f"---")
+    st.markdown("---")
 
 elif st.session_state.current_page == "1. Initial Setup: Core Configuration":
-    st.markdown(f"### 1. Initial Setup: Environment and Dependencies")
-    st.markdown(f"Before we dive into defining and validating our application settings, let's ensure our environment has all the necessary tools. We'll specifically need `pydantic` and `pydantic-settings` for robust configuration management.")
-    st.markdown(
-        f"```python\n!pip install pydantic==2.* pydantic-settings==2.*\n```")
+    st.markdown("\n\n".join([
+        "### 1. Initial Setup: Environment and Dependencies",
+        "Before we dive into defining and validating our application settings, let's ensure our environment has all the necessary tools. We'll specifically need `pydantic` and `pydantic-settings` for robust configuration management.",
+        "```python\n!pip install pydantic==2.* pydantic-settings==2.*\n```",
+    ]))
 elif st.session_state.current_page == "4. Field-Level Validation":
-    st.markdown(f"### 3. Ensuring Operational Integrity: Field-Level Validation")
-    st.markdown(f"Operational parameters like API rate limits, daily cost budgets, and alert thresholds are critical for the stability and cost-effectiveness of our PE intelligence platform. As a Data Engineer, I need to ensure these values are always within sensible, predefined ranges to prevent system overload, budget overruns, or ineffective alerting. Pydantic's `Field` with `ge` (greater than or equal to) and `le` (less than or equal to) arguments allows us to enforce these constraints directly within the configuration definition.")
-
-    st.markdown(f"#### Field-Level Validation Code")
-    st.markdown(
-        f"Here's how we define field-level constraints using Pydantic's `Field`:")
+    st.markdown("\n\n".join([
+        "### 3. Ensuring Operational Integrity: Field-Level Validation",
+        "Operational parameters like API rate limits, daily cost budgets, and alert thresholds are critical for the stability and cost-effectiveness of our PE intelligence platform. As a Data Engineer, I need to ensure these values are always within sensible, predefined ranges to prevent system overload, budget overruns, or ineffective alerting. Pydantic's `Field` with `ge` (greater than or equal to) and `le` (less than or equal to) arguments allows us to enforce these constraints directly within the configuration definition.",
+        "#### Field-Level Validation Code",
+        "Here's how we define field-level constraints using Pydantic's `Field`:",
+    ]))
     st.code('''# API Rate Limiting
 RATE_LIMIT_PER_MINUTE: int = Field(default=60, ge=1, le=1000)
 
@@ -516,11 +855,11 @@ BETA_SYNERGY_WEIGHT: float = Field(default=0.12, ge=0.08, le=0.20)
 LAMBDA_PENALTY: float = Field(default=0.25, ge=0, le=0.50)
 DELTA_POSITION: float = Field(default=0.15, ge=0.10, le=0.20)''', language='python')
 
-    st.markdown(
-        f"#### Workflow Task: Validate Operational Parameters with Range Constraints")
-    st.markdown(f"We'll define an API rate limit (`RATE_LIMIT_PER_MINUTE`), a daily cost budget (`DAILY_COST_BUDGET_USD`), and a cost alert threshold (`COST_ALERT_THRESHOLD_PCT`). These parameters are crucial for system health and financial governance.")
-
-    st.markdown(f"Configure the operational parameters below and click 'Validate'. Observe how Pydantic handles values outside the expected ranges:")
+    st.markdown("\n\n".join([
+        "#### Workflow Task: Validate Operational Parameters with Range Constraints",
+        "We'll define an API rate limit (`RATE_LIMIT_PER_MINUTE`), a daily cost budget (`DAILY_COST_BUDGET_USD`), and a cost alert threshold (`COST_ALERT_THRESHOLD_PCT`). These parameters are crucial for system health and financial governance.",
+        "Configure the operational parameters below and click 'Validate'. Observe how Pydantic handles values outside the expected ranges:",
+    ]))
 
     col1, col2 = st.columns(2)
     with col1:
@@ -537,6 +876,7 @@ DELTA_POSITION: float = Field(default=0.15, ge=0.10, le=0.20)''', language='pyth
             "HITL EBITDA Projection Threshold (5-25)", min_value=5.0, max_value=50.0, value=15.0, step=1.0)
 
     if st.button("Validate Operational Settings"):
+        src = _load_source()
         env_vars = {
             "RATE_LIMIT_PER_MINUTE": rate_limit,
             "DAILY_COST_BUDGET_USD": daily_budget,
@@ -545,13 +885,12 @@ DELTA_POSITION: float = Field(default=0.15, ge=0.10, le=0.20)''', language='pyth
             "HITL_EBITDA_PROJECTION_THRESHOLD": hitl_ebitda_projection
         }
         _set_env_vars(env_vars)
-        get_settings_operational_validation.cache_clear()
         try:
-            settings = get_settings_operational_validation()
+            settings = src.Settings()
             st.session_state.operational_settings_valid = True
             st.session_state.operational_validation_error = None
             st.success("✅ Operational settings are VALID!")
-            st.markdown(f"**Loaded Settings:**")
+            st.markdown("**Loaded Settings:**")
             st.markdown(
                 f"  API Rate Limit: `{settings.RATE_LIMIT_PER_MINUTE}` req/min")
             st.markdown(
@@ -562,34 +901,27 @@ DELTA_POSITION: float = Field(default=0.15, ge=0.10, le=0.20)''', language='pyth
                 f"  HITL Score Change Threshold: `{settings.HITL_SCORE_CHANGE_THRESHOLD}`")
             st.markdown(
                 f"  HITL EBITDA Projection Threshold: `{settings.HITL_EBITDA_PROJECTION_THRESHOLD}`")
-        except ValidationError as e:
+        except src.ValidationError as e:
             st.session_state.operational_settings_valid = False
-            st.session_state.operational_validation_error = e
+            st.session_state.operational_validation_error = str(e)
             st.error(
-                f"❌ Operational settings are INVALID! Details: \n```\n{e}\n```")
+                f"❌ Operational settings are INVALID! Details: \n```\n{st.session_state.operational_validation_error}\n```")
         finally:
             _clear_env_vars()
 
-    if st.session_state.operational_validation_error:
-        st.markdown(f"**Last Validation Result:**")
-        if st.session_state.operational_settings_valid:
-            st.success("✅ Valid settings were loaded last.")
-        else:
-            st.error(
-                f"❌ Last attempt resulted in an error:\n```\n{st.session_state.operational_validation_error}\n```")
+    _display_validation_result('operational_settings_valid', 'operational_validation_error')
 
-    st.markdown(f"The first scenario demonstrates successful loading when all operational parameters are within their defined bounds. In contrast, the second scenario attempts to load configurations with values exceeding or falling below the specified ranges for `RATE_LIMIT_PER_MINUTE`, `DAILY_COST_BUDGET_USD`, `COST_ALERT_THRESHOLD_PCT`, `HITL_SCORE_CHANGE_THRESHOLD`, and `HITL_EBITDA_PROJECTION_THRESHOLD`. Pydantic immediately raises a `ValidationError`, providing clear, detailed messages about which specific fields failed and why. This automatic, early detection of out-of-bounds values by `Field(ge=X, le=Y)` is crucial. It prevents the system from starting with configurations that could lead to financial losses (e.g., negative budget), operational issues (e.g., excessively high rate limits), or ineffective human-in-the-loop interventions due to inappropriate thresholds.")
-    st.markdown(f"---")
+    st.markdown("\n\n".join([
+        "The first scenario demonstrates successful loading when all operational parameters are within their defined bounds. In contrast, the second scenario attempts to load configurations with values exceeding or falling below the specified ranges for `RATE_LIMIT_PER_MINUTE`, `DAILY_COST_BUDGET_USD`, `COST_ALERT_THRESHOLD_PCT`, `HITL_SCORE_CHANGE_THRESHOLD`, and `HITL_EBITDA_PROJECTION_THRESHOLD`. Pydantic immediately raises a `ValidationError`, providing clear, detailed messages about which specific fields failed and why. This automatic, early detection of out-of-bounds values by `Field(ge=X, le=Y)` is crucial. It prevents the system from starting with configurations that could lead to financial losses (e.g., negative budget), operational issues (e.g., excessively high rate limits), or ineffective human-in-the-loop interventions due to inappropriate thresholds.",
+        "---",
+    ]))
 
 elif st.session_state.current_page == "5. Cross-Field Validation (Scoring Weights)":
-    st.markdown(
-        f"### 4. Implementing Business Logic: Cross-Field Validation for Scoring Weights")
-    st.markdown(f"A core component of the PE intelligence platform is its investment scoring model, which relies on various dimensions (e.g., data infrastructure, AI governance, talent). The relative importance of these dimensions is defined by a set of weights. A critical business rule mandates that these **dimension weights must sum up to exactly 1.0** to ensure a coherent and balanced scoring mechanism. Deviations from this sum would lead to skewed, unreliable scores and potentially poor investment recommendations.")
-    st.markdown(f"As a Data Engineer, I need to implement a robust check to enforce this rule. Pydantic's `@model_validator(mode=\"after\")` is perfect for this, as it allows us to perform validation logic that involves multiple fields *after* individual field validations have passed.")
+    # Only this page needs the dataframe stack
+    import numpy as np
+    import pandas as pd
 
-    st.markdown(f"#### Cross-Field Validation Code")
-    st.markdown(
-        f"Here's how we implement cross-field validation to ensure dimension weights sum to 1.0:")
+    st.markdown(_WEIGHTS_INTRO_MD)
     st.code('''# Dimension Weight Fields
 W_DATA_INFRA: float = Field(default=0.18, ge=0.0, le=1.0)
 W_AI_GOVERNANCE: float = Field(default=0.15, ge=0.0, le=1.0)
@@ -611,91 +943,56 @@ def validate_dimension_weights(self):
         raise ValueError(f"Dimension weights must sum to 1.0, got {total}")
     return self''', language='python')
 
-    st.markdown(f"#### Workflow Task: Validate Dimension Weights Sum to 1.0")
-    st.markdown(f"We will define new fields for dimension weights and then add a `@model_validator` to ensure their sum is $1.0$. A small tolerance $\epsilon$ is used to account for floating-point inaccuracies. The validation check will be:")
-
-    st.markdown(r"$$\left| \sum_{{i=1}}^{{n}} w_i - 1.0 \right| > \epsilon$$")
-    st.markdown(r"where $w_i$ are the dimension weights and $\epsilon = 0.001$.")
-
-    st.markdown(f"Adjust the dimension weights below. Ensure their sum is approximately 1.0 (within 0.001 tolerance) to pass validation. The default values sum to 1.0.")
+    st.markdown(_WEIGHTS_TASK_MD)
+
+    weights_df = pd.DataFrame(
+        {"weight": list(_DEFAULT_WEIGHTS.values())}, index=list(_DEFAULT_WEIGHTS))
+    with st.form("weights_form", clear_on_submit=False):
+        edited_weights = st.data_editor(
+            weights_df,
+            num_rows="fixed",
+            column_config={"weight": st.column_config.NumberColumn(
+                min_value=0.0, max_value=1.0, step=0.01)},
+            key="weights_editor",
+        )
+        submitted = st.form_submit_button("Validate Dimension Weights")
 
-    col1, col2 = st.columns(2)
-    with col1:
-        w_data_infra = st.slider(
-            "W_DATA_INFRA", min_value=0.0, max_value=1.0, value=0.18, step=0.01)
-        w_ai_governance = st.slider(
-            "W_AI_GOVERNANCE", min_value=0.0, max_value=1.0, value=0.15, step=0.01)
-        w_tech_stack = st.slider(
-            "W_TECH_STACK", min_value=0.0, max_value=1.0, value=0.15, step=0.01)
-        w_talent = st.slider("W_TALENT", min_value=0.0,
-                             max_value=1.0, value=0.17, step=0.01)
-    with col2:
-        w_leadership = st.slider(
-            "W_LEADERSHIP", min_value=0.0, max_value=1.0, value=0.13, step=0.01)
-        w_use_cases = st.slider(
-            "W_USE_CASES", min_value=0.0, max_value=1.0, value=0.12, step=0.01)
-        w_culture = st.slider("W_CULTURE", min_value=0.0,
-                              max_value=1.0, value=0.10, step=0.01)
-
-    weights_sum = w_data_infra + w_ai_governance + w_tech_stack + \
-        w_talent + w_leadership + w_use_cases + w_culture
+    weights = edited_weights["weight"].to_numpy(dtype=np.float64)
+    weights_sum = float(weights.sum())
     st.info(f"Current sum of weights: `{weights_sum:.2f}`")
 
-    if st.button("Validate Dimension Weights"):
-        env_vars = {
-            "W_DATA_INFRA": w_data_infra,
-            "W_AI_GOVERNANCE": w_ai_governance,
-            "W_TECH_STACK": w_tech_stack,
-            "W_TALENT": w_talent,
-            "W_LEADERSHIP": w_leadership,
-            "W_USE_CASES": w_use_cases,
-            "W_CULTURE": w_culture
-        }
-        _set_env_vars(env_vars)
-        get_settings_with_weights.cache_clear()
-        try:
-            settings = get_settings_with_weights()
+    if submitted:
+        settings, error = _validate_weights(
+            tuple(zip(edited_weights.index, weights.tolist())))
+        result_slot = st.empty()
+        if error is None:
             st.session_state.weights_settings_valid = True
             st.session_state.weights_validation_error = None
-            st.success("✅ Dimension weights are VALID!")
-            st.markdown(f"**Loaded Weights:**")
-            st.markdown(f"  Data Infra: `{settings.W_DATA_INFRA}`")
-            st.markdown(f"  AI Governance: `{settings.W_AI_GOVERNANCE}`")
-            st.markdown(f"  Tech Stack: `{settings.W_TECH_STACK}`")
-            st.markdown(f"  Talent: `{settings.W_TALENT}`")
-            st.markdown(f"  Leadership: `{settings.W_LEADERSHIP}`")
-            st.markdown(f"  Use Cases: `{settings.W_USE_CASES}`")
-            st.markdown(f"  Culture: `{settings.W_CULTURE}`")
-            st.markdown(f"  **Total Sum: `{weights_sum:.2f}`**")
-        except ValidationError as e:
+            with result_slot.container():
+                st.success("✅ Dimension weights are VALID!")
+                st.markdown("**Loaded Weights:**")
+                st.table(pd.DataFrame(
+                    [(label, getattr(settings, attr)) for label, attr in _WEIGHT_ROWS],
+                    columns=["Dimension", "Weight"]))
+                st.markdown(f"  **Total Sum: `{weights_sum:.2f}`**")
+        else:
             st.session_state.weights_settings_valid = False
-            st.session_state.weights_validation_error = e
-            st.error(
-                f"❌ Dimension weights are INVALID! Details: \n```\n{e}\n```")
-        finally:
-            _clear_env_vars()
+            st.session_state.weights_validation_error = error
+            result_slot.error(
+                f"❌ Dimension weights are INVALID! Details: \n```\n{error}\n```")
 
-    if st.session_state.weights_validation_error:
-        st.markdown(f"**Last Validation Result:**")
-        if st.session_state.weights_settings_valid:
-            st.success("✅ Valid settings were loaded last.")
-        else:
-            st.error(
-                f"❌ Last attempt resulted in an error:\n```\n{st.session_state.weights_validation_error}\n```")
+    _display_validation_result('weights_settings_valid', 'weights_validation_error')
 
-    st.markdown(f"The first scenario successfully loads settings where the default dimension weights (or explicitly set ones that sum to 1.0) pass the `@model_validator`. This demonstrates a correct configuration. The second scenario, however, intentionally provides weights that do not sum to $1.0$. As expected, Pydantic's `@model_validator` catches this discrepancy and raises a `ValueError` wrapped within a `ValidationError`.")
-    st.markdown(f"This validation is critical for the PE intelligence platform. It ensures that the investment scoring model is always configured with logically consistent weights, preventing calculation errors that could lead to flawed analytical outputs and incorrect investment decisions. It’s a direct safeguard against subtle yet significant business logic flaws that might otherwise only be detected much later in the analysis pipeline, if at all.")
-    st.markdown(f"---")
+    st.markdown(_WEIGHTS_OUTRO_MD)
 
 elif st.session_state.current_page == "6. Environment-Specific Validation (Production)":
-    st.markdown(
-        f"### 5. Fortifying Production: Conditional Environment-Specific Validation")
-    st.markdown(f"Deploying to a production environment demands a heightened level of rigor. As a Software Developer, I need to ensure that certain security and operational settings are strictly enforced *only* when the application is running in a `production` environment. For instance, `DEBUG` mode must be disabled, sensitive `SECRET_KEY`s must meet minimum length requirements, and all critical external service API keys (like LLM provider keys) must be present.")
-    st.markdown(f"This conditional validation logic is best implemented using another `@model_validator(mode=\"after\")`, which allows us to inspect the `APP_ENV` and apply specific rules accordingly. We'll also include a `@field_validator` for `OPENAI_API_KEY` to ensure it starts with the expected \"sk-\" prefix, an example of a specific format requirement.")
-
-    st.markdown(f"#### Validation Code Implementation")
-    st.markdown(
-        f"Here's the code that validates production settings and API key formats:")
+    st.markdown("\n\n".join([
+        "### 5. Fortifying Production: Conditional Environment-Specific Validation",
+        "Deploying to a production environment demands a heightened level of rigor. As a Software Developer, I need to ensure that certain security and operational settings are strictly enforced *only* when the application is running in a `production` environment. For instance, `DEBUG` mode must be disabled, sensitive `SECRET_KEY`s must meet minimum length requirements, and all critical external service API keys (like LLM provider keys) must be present.",
+        "This conditional validation logic is best implemented using another `@model_validator(mode=\"after\")`, which allows us to inspect the `APP_ENV` and apply specific rules accordingly. We'll also include a `@field_validator` for `OPENAI_API_KEY` to ensure it starts with the expected \"sk-\" prefix, an example of a specific format requirement.",
+        "#### Validation Code Implementation",
+        "Here's the code that validates production settings and API key formats:",
+    ]))
     st.code('''@field_validator("OPENAI_API_KEY")
 @classmethod
 def validate_openai_key(cls, v: Optional[SecretStr]) -> Optional[SecretStr]:
@@ -715,245 +1012,96 @@ def validate_production_settings(self) -> "Settings":
             raise ValueError("At least one LLM API key (OpenAI or Anthropic) is required in production")
     return self''', language='python')
 
-    st.markdown(
-        f"#### Workflow Task: Enforce Production Security and API Key Presence")
-    st.markdown(f"We will add a `@model_validator` to the `Settings` class that performs the following checks when `APP_ENV` is set to `\"production\"`:")
-    st.markdown(f"1.  `DEBUG` mode must be `False`.")
-    st.markdown(f"2.  `SECRET_KEY` length must be at least 32 characters.")
-    st.markdown(
-        f"3.  At least one of `OPENAI_API_KEY` or `ANTHROPIC_API_KEY` must be provided.")
+    st.markdown("\n\n".join([
+        "#### Workflow Task: Enforce Production Security and API Key Presence",
+        "We will add a `@model_validator` to the `Settings` class that performs the following checks when `APP_ENV` is set to `\"production\"`:",
+    ]))
+    st.markdown(_PROD_RULES_MD)
 
     st.markdown(
-        f"Configure the settings below, paying attention to production requirements:")
+        "Configure the settings below, paying attention to production requirements:")
 
-    col1, col2 = st.columns(2)
-    with col1:
+    with st.form("prod_form", clear_on_submit=False):
         app_env = st.selectbox(
             "APP_ENV", ["development", "staging", "production"], index=0)
+        # Keyed so a tick survives submit: the default follows APP_ENV, which would
+        # otherwise give the checkbox a new identity when production is selected
         debug_mode = st.checkbox(
-            "DEBUG Mode", value=True if app_env == "development" else False)
+            "DEBUG Mode", value=True if app_env == "development" else False, key="prod_debug")
         secret_key = st.text_input(
             "SECRET_KEY (min 32 chars in production)", "dev_key_for_testing_12345678901234567890")
-    with col2:
         openai_key = st.text_input("OPENAI_API_KEY (starts with 'sk-')", "")
         anthropic_key = st.text_input("ANTHROPIC_API_KEY", "")
-        st.markdown(f"*(Note: One LLM API key is required in production)*")
-
-    # Client-side validation feedback
-    validation_messages = []
-
-    if not openai_key and not anthropic_key and app_env == "production":
-        st.warning("⚠️ At least one LLM API key is required in production")
-        validation_messages.append("No LLM API key provided")
-
-    if openai_key and not openai_key.startswith("sk-"):
-        st.warning("⚠️ OpenAI API key should start with 'sk-'")
-        validation_messages.append("OpenAI key format invalid")
-
-    if anthropic_key and not anthropic_key.startswith("sk-ant-"):
-        st.info("💡 Anthropic API keys typically start with 'sk-ant-'")
-
-    if app_env == "production":
-        if len(secret_key) < 32:
-            st.warning(
-                f"⚠️ SECRET_KEY is only {len(secret_key)} characters. Production requires ≥32 characters.")
-            validation_messages.append("SECRET_KEY too short")
-
-        if not openai_key and not anthropic_key:
-            st.warning(
-                "⚠️ Production environment requires at least one LLM API key")
-            validation_messages.append("No LLM API key provided")
-
-        if debug_mode:
-            st.warning("⚠️ DEBUG mode should be disabled in production")
-            validation_messages.append("DEBUG enabled in production")
-
-    if st.button("Validate Settings"):
-        # Explicitly clear API key environment variables first
-        _clear_env_vars()
-
-        env_vars = {
-            "APP_ENV": app_env,
-            "DEBUG": debug_mode,
-            "SECRET_KEY": secret_key,
-        }
-
-        # Only set API keys if they're non-empty
-        if openai_key and openai_key.strip():
-            env_vars["OPENAI_API_KEY"] = openai_key
-        if anthropic_key and anthropic_key.strip():
-            env_vars["ANTHROPIC_API_KEY"] = anthropic_key
-
-        _set_env_vars(env_vars)
-        get_settings_with_prod_validation.cache_clear()
-        try:
-            settings = get_settings_with_prod_validation()
+        st.markdown("*(Note: One LLM API key is required in production)*")
+        submitted = st.form_submit_button("Validate Settings")
+
+    if submitted:
+        # Client-side validation feedback
+        check_ctx = SimpleNamespace(
+            prod=app_env == "production", debug=debug_mode,
+            secret_len=len(secret_key), openai=openai_key, anthropic=anthropic_key)
+        for predicate, severity, message in _PROD_CHECKS:
+            if predicate(check_ctx):
+                getattr(st, severity)(message.format(**vars(check_ctx)))
+
+        settings, error = _validate_prod(
+            app_env, debug_mode, secret_key, openai_key, anthropic_key)
+        result_slot = st.empty()
+        if error is None:
             st.session_state.prod_settings_valid = True
             st.session_state.prod_validation_error = None
-            st.success("✅ Settings are VALID!")
-            st.markdown(f"**Loaded Settings:**")
-            st.markdown(f"  APP_ENV: `{settings.APP_ENV}`")
-            st.markdown(f"  DEBUG: `{settings.DEBUG}`")
-            st.markdown(
-                f"  SECRET_KEY length: `{len(settings.SECRET_KEY.get_secret_value())}`")
-            st.markdown(
-                f"  OpenAI API Key provided: `{'Yes' if settings.OPENAI_API_KEY else 'No'}`")
-            st.markdown(
-                f"  Anthropic API Key provided: `{'Yes' if settings.ANTHROPIC_API_KEY else 'No'}`")
-        except ValidationError as e:
+            with result_slot.container():
+                st.success("✅ Settings are VALID!")
+                st.markdown("\n".join([
+                    "**Loaded Settings:**",
+                    f"- APP_ENV: `{settings.APP_ENV}`",
+                    f"- DEBUG: `{settings.DEBUG}`",
+                    f"- SECRET_KEY length: `{check_ctx.secret_len}`",
+                    f"- OpenAI API Key provided: `{'Yes' if settings.OPENAI_API_KEY else 'No'}`",
+                    f"- Anthropic API Key provided: `{'Yes' if settings.ANTHROPIC_API_KEY else 'No'}`",
+                ]))
+        else:
             st.session_state.prod_settings_valid = False
-            st.session_state.prod_validation_error = e
-            st.error(
-                f"❌ Production settings are INVALID! Details: \n```\n{e}\n```")
-        finally:
-            _clear_env_vars()
+            st.session_state.prod_validation_error = error
+            result_slot.error(
+                f"❌ Production settings are INVALID! Details: \n```\n{error}\n```")
 
-    if st.session_state.prod_validation_error:
-        st.markdown(f"**Last Validation Result:**")
-        if st.session_state.prod_settings_valid:
-            st.success("✅ Valid settings were loaded last.")
-        else:
-            st.error(
-                f"❌ Last attempt resulted in an error:\n```\n{st.session_state.prod_validation_error}\n```")
+    _display_validation_result('prod_settings_valid', 'prod_validation_error')
 
-    st.markdown(f"For a Software Developer or Data Engineer, these explicit error messages at application startup are invaluable. They act as an immediate feedback mechanism, preventing the deployment of insecure or non-functional configurations to live environments. This proactive validation drastically reduces the risk of security breaches, service outages, or unexpected runtime behavior stemming from configuration errors.")
-    st.markdown(f"---")
+    st.markdown("#### Bulk-check OpenAI key format")
+    keys_csv = st.file_uploader(
+        "Upload a CSV with one OpenAI API key per row (first column)", type="csv")
+    if keys_csv is not None:
+        import pandas as pd
+        try:
+            keys = pd.read_csv(keys_csv, header=None, dtype=str).iloc[:, 0].fillna("")
+        except pd.errors.EmptyDataError:
+            keys = pd.Series([], dtype=str)
+        ok = _bulk_prefix_ok(keys.tolist(), "sk-")
+        st.markdown(f"`{int(ok.sum())}` of `{ok.size}` keys start with `sk-`.")
+        if not ok.all():
+            # Report row numbers only; the keys themselves are secrets
+            bad_rows = (~ok).nonzero()[0] + 1
+            st.warning(f"⚠️ Rows with an invalid prefix: {bad_rows.tolist()}")
+
+    st.markdown("\n\n".join([
+        "For a Software Developer or Data Engineer, these explicit error messages at application startup are invaluable. They act as an immediate feedback mechanism, preventing the deployment of insecure or non-functional configurations to live environments. This proactive validation drastically reduces the risk of security breaches, service outages, or unexpected runtime behavior stemming from configuration errors.",
+        "---",
+    ]))
 
 elif st.session_state.current_page == "Configuration Simulation & Troubleshooting":
-    st.markdown(
-        f"### 6. Catching Errors Early: Configuration Simulation and Reporting")
-    st.markdown(f"The ultimate value of a robust configuration validation system is its ability to prevent failures before they impact users. As a Data Engineer preparing a deployment, I need a way to confidently verify that a given set of environment variables or configuration files will result in a valid application state. This \"Validated Configuration Report\" ensures that any potential issues are identified and resolved during development or staging, rather than during a critical production rollout.")
-    st.markdown(f"We can simulate different configuration scenarios and observe Pydantic's error reporting. This acts as our \"report,\" detailing what works and what breaks, and why.")
-
-    st.markdown(f"### Common Mistakes & Troubleshooting")
-
-    st.markdown(f"#### ❌ Mistake 1: Dimension weights don't sum to 1.0")
-    st.code('''# WRONG
-W_DATA_INFRA = 0.20
-W_AI_GOVERNANCE = 0.15
-W_TECH_STACK = 0.15
-W_TALENT = 0.20
-W_LEADERSHIP = 0.15
-W_USE_CASES = 0.10
-W_CULTURE = 0.10
-# Sum = 1.05!''', language='python')
-
-    if st.button("Show Fix for Mistake 1", key="fix_btn_1"):
-        st.session_state.show_fix_1 = not st.session_state.show_fix_1
+    st.markdown(_MISTAKES_INTRO_MD)
 
-    if st.session_state.show_fix_1:
-        st.success("✅ **Fixed Code:**")
-        st.code('''# CORRECT
-W_DATA_INFRA = 0.18
-W_AI_GOVERNANCE = 0.15
-W_TECH_STACK = 0.15
-W_TALENT = 0.17
-W_LEADERSHIP = 0.13
-W_USE_CASES = 0.12
-W_CULTURE = 0.10
-# Sum = 1.00 ✓
-
-@model_validator(mode="after")
-def validate_dimension_weights(self):
-    """Validate dimension weights sum to 1.0."""
-    weights = [
-        self.W_DATA_INFRA, self.W_AI_GOVERNANCE, self.W_TECH_STACK,
-        self.W_TALENT, self.W_LEADERSHIP, self.W_USE_CASES, self.W_CULTURE
-    ]
-    total = sum(weights)
-    if abs(total - 1.0) > 0.001:
-        raise ValueError(f"Dimension weights must sum to 1.0, got {total}")
-    return self''', language='python')
-        st.markdown(f"**Explanation:** The `@model_validator` automatically catches invalid weight sums at startup, preventing configuration errors from reaching production.")
-
-    st.markdown(f"#### ❌ Mistake 2: Exposing secrets in logs")
-    st.code('''# WRONG
-logger.info("connecting", password=settings.SNOWFLAKE_PASSWORD)''', language='python')
-
-    if st.button("Show Fix for Mistake 2", key="fix_btn_2"):
-        st.session_state.show_fix_2 = not st.session_state.show_fix_2
-
-    if st.session_state.show_fix_2:
-        st.success("✅ **Fixed Code:**")
-        st.code('''# CORRECT - SecretStr masks the value automatically
-from pydantic import SecretStr
-
-class Settings(BaseSettings):
-    SNOWFLAKE_PASSWORD: SecretStr  # Will be masked in logs
-    
-# Safe logging - password is masked
-logger.info("connecting", password=settings.SNOWFLAKE_PASSWORD)
-# Output: password=SecretStr('**********')
-
-# Only access the secret when actually needed
-actual_password = settings.SNOWFLAKE_PASSWORD.get_secret_value()''', language='python')
-        st.markdown(f"**Explanation:** `SecretStr` automatically masks sensitive values in logs and string representations, preventing accidental exposure.")
-
-    st.markdown(f"#### ❌ Mistake 3: Missing lifespan context manager")
-    st.code('''# WRONG - No cleanup on shutdown
-app = FastAPI()
-redis_client = Redis()  # Leaks on shutdown!''', language='python')
-
-    if st.button("Show Fix for Mistake 3", key="fix_btn_3"):
-        st.session_state.show_fix_3 = not st.session_state.show_fix_3
-
-    if st.session_state.show_fix_3:
-        st.success("✅ **Fixed Code:**")
-        st.code('''# CORRECT - Proper resource management
-from contextlib import asynccontextmanager
+    for i, (title, wrong_code, fixed_code, explanation) in enumerate(_MISTAKES, start=1):
+        st.markdown(f"#### ❌ Mistake {i}: {title}")
+        st.code(wrong_code, language='python')
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    redis_client = Redis()
-    logger.info("redis_connected")
-    
-    yield  # Application runs here
-    
-    # Shutdown - guaranteed cleanup
-    await redis_client.close()
-    logger.info("redis_disconnected")
-
-app = FastAPI(lifespan=lifespan)''', language='python')
-        st.markdown(f"**Explanation:** The lifespan context manager ensures proper cleanup of connections and resources when the application shuts down, preventing resource leaks.")
-
-    st.markdown(f"#### ❌ Mistake 4: Not validating at startup")
-    st.code('''# WRONG - Fails at runtime when first used
-def get_sector_baseline(sector_id):
-    return db.query(...)  # Database not connected!''', language='python')
-
-    if st.button("Show Fix for Mistake 4", key="fix_btn_4"):
-        st.session_state.show_fix_4 = not st.session_state.show_fix_4
-
-    if st.session_state.show_fix_4:
-        st.success("✅ **Fixed Code:**")
-        st.code('''# CORRECT - Validate at startup
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup validation
-    settings = get_settings()  # Pydantic validates here
-    
-    # Test database connection
-    try:
-        await db.execute("SELECT 1")
-        logger.info("database_validated")
-    except Exception as e:
-        logger.error("database_validation_failed", error=str(e))
-        raise  # Fail fast - don't start if DB is unreachable
-    
-    yield
-    
-    # Shutdown
-    await db.close()
-
-app = FastAPI(lifespan=lifespan)
-
-# Now this is safe - we know DB is connected
-def get_sector_baseline(sector_id):
-    return db.query(...)''', language='python')
-        st.markdown(f"**Explanation:** Validate all external dependencies during startup using the lifespan context manager. This ensures the application fails fast with clear errors rather than failing mysteriously at runtime.")
+        with st.expander(f"Show Fix for Mistake {i}"):
+            st.success("✅ **Fixed Code:**")
+            st.code(fixed_code, language='python')
+            st.markdown(f"**Explanation:** {explanation}")
 
-    st.markdown(f"---")
+    st.markdown("---")
 
 
 # License